@@ -7,6 +7,7 @@ Usage:
     python analyze_capture.py <capture.pcap>
 """
 
+import os
 import sys
 try:
     from scapy.all import rdpcap, USB
@@ -14,6 +15,11 @@ except ImportError:
     print("Installez scapy: pip install scapy")
     sys.exit(1)
 
+# Codec partagé avec le driver Linux
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'linux_driver'))
+import protocol
+
 # IDs de la manette Turtle Beach
 VENDOR_ID = 0x10F5
 PRODUCT_ID = 0x7018
@@ -66,26 +72,19 @@ def analyze_pcap(filename):
             decode_vibration_packet(c['data'])
 
 def decode_vibration_packet(data):
-    """Tente de décoder un paquet de vibration Xbox."""
-    if len(data) < 4:
-        return
-    
-    # Format Xbox One standard (pas forcément celui de Turtle Beach):
-    # Byte 0: Report ID (0x09 pour vibration)
-    # Byte 1: Sub-command
-    # Byte 2: Left trigger motor
-    # Byte 3: Right trigger motor  
-    # Byte 4: Left motor (gros moteur)
-    # Byte 5: Right motor (petit moteur)
+    """Décode un paquet de vibration Turtle Beach (voir docs/PROTOCOL.md)."""
+    # Avec USBPcap, le pseudo-header précède les données: le paquet est à la fin
+    packet = protocol.try_decode(data) or protocol.try_decode(data[-protocol.PACKET_SIZE:])
+    if packet is None:
+        print("    Pas un paquet de vibration Turtle Beach")
+        return None
     
-    print(f"    Possible décodage:")
-    print(f"      Report ID: 0x{data[0]:02X}")
-    if len(data) > 1:
-        print(f"      Byte 1: 0x{data[1]:02X}")
-    if len(data) > 4:
-        print(f"      Moteur gauche?: 0x{data[4]:02X} ({data[4]})")
-    if len(data) > 5:
-        print(f"      Moteur droit?: 0x{data[5]:02X} ({data[5]})")
+    print(f"    Vibration: seq={packet.sequence} mask=0x{packet.mask:02X}")
+    print(f"      Gâchette gauche: {packet.left_trigger}")
+    print(f"      Gâchette droite: {packet.right_trigger}")
+    print(f"      Moteur gauche:   {packet.left}")
+    print(f"      Moteur droit:    {packet.right}")
+    return packet
 
 def main():
     if len(sys.argv) < 2:
@@ -4,6 +4,8 @@ Utilise USBPcap pour capturer le trafic et l'analyser à la volée.
 
 Ce script aide à identifier les commandes de vibration en temps réel
 pendant que vous jouez à un jeu.
+
+Sous Linux, utilisez plutôt linux_driver/usbmon.py (capture usbmon en direct).
 """
 
 import subprocess
@@ -115,6 +117,10 @@ def main():
     print("Guide de capture USB pour Turtle Beach Controller")
     print("=" * 60)
     
+    if sys.platform.startswith('linux'):
+        print("\n[*] Linux détecté: USBPcap n'existe que sous Windows.")
+        print("    Moniteur usbmon en direct: sudo python linux_driver/usbmon.py")
+    
     print(generate_wireshark_filter())
     
     # Vérifier si USBPcap est installé
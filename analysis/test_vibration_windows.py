@@ -8,9 +8,15 @@ Requis:
     pip install pywinusb xinput-python hidapi
 """
 
+import os
 import time
 import sys
 
+# Codec partagé avec le driver Linux
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'linux_driver'))
+import protocol
+
 # Turtle Beach Controller IDs
 VENDOR_ID = 0x10F5
 PRODUCT_ID = 0x7018
@@ -83,9 +89,12 @@ def test_hid_direct():
                 
                 # Essayer différents formats de commande de vibration
                 # Format Xbox One standard
+                sequence = 0  # Séquence des paquets Turtle Beach (byte 2)
                 vibration_commands = [
-                    # Format 1: Xbox One standard
-                    bytes([0x09, 0x00, 0x00, 0x09, 0x00, 0x0F, 0xFF, 0xFF, 0x00, 0x00]),
+                    # Format 1: Turtle Beach (protocole découvert, 0-100),
+                    # moteurs principaux L/R à 100. Remplace l'ancien essai
+                    # brut qui mettait les gâchettes LT/RT à 0xFF
+                    protocol.encode(sequence, left=100, right=100),
                     # Format 2: Simplifié
                     bytes([0x00, 0x01, 0x0F, 0xFF, 0xFF, 0x00, 0x00, 0x00]),
                     # Format 3: Autre variante
@@ -101,7 +110,9 @@ def test_hid_direct():
                         print(f"      Erreur: {e}")
                 
                 # Arrêter vibration
-                stop_cmd = bytes([0x09, 0x00, 0x00, 0x09, 0x00, 0x0F, 0x00, 0x00, 0x00, 0x00])
+                # Seul le Format 1 consomme une séquence: l'arrêt prend la suivante
+                sequence += 1
+                stop_cmd = protocol.encode(sequence)
                 device.write(stop_cmd)
                 
                 device.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark du temps de démarrage du CLI de vibration.
+
+Chaque mesure lance un nouvel interpréteur Python (comme un appel scripté)
+et chronomètre les phases:
+    - import:  import du module vibration
+    - parse:   analyse des arguments
+    - connect: ouverture de la manette (cache du chemin HID si disponible)
+    - packet:  envoi du premier paquet (intensité 0, la manette ne vibre pas)
+    - process: durée totale du processus, vue depuis le parent
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 50 --mock
+    python bench_startup.py --no-cache --argv "--left 0 --right 0 -d 0"
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Code exécuté dans le processus enfant: mesure chaque phase et l'imprime en JSON
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {here!r})
+import vibration
+t1 = time.perf_counter()
+args = vibration.parse_args({argv!r})
+t2 = time.perf_counter()
+controller = vibration.TurtleBeachController(verbose=False)
+if {mock!r}:
+    from mock import MockDevice
+    controller.device = MockDevice()
+    ok = True
+else:
+    ok = controller.connect(use_cache={use_cache!r})
+t3 = time.perf_counter()
+sent = ok and controller.vibrate(0, 0)
+t4 = time.perf_counter()
+if ok:
+    controller.device.close()
+print(json.dumps({{'import': t1 - t0, 'parse': t2 - t1, 'connect': t3 - t2,
+                  'packet': t4 - t3, 'ok': bool(ok and sent)}}))
+"""
+
+PHASES = ['import', 'parse', 'connect', 'packet', 'process']
+
+
+def run_once(python: str, code: str) -> dict:
+    """Lance un processus enfant et retourne ses mesures (en secondes)."""
+    start = time.perf_counter()
+    result = subprocess.run([python, '-c', code], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process'] = elapsed
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark démarrage CLI vibration')
+    parser.add_argument('--runs', '-n', type=int, default=20, help='Nombre de lancements')
+    parser.add_argument('--mock', action='store_true',
+                        help='Utiliser un faux périphérique (pas de manette requise)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Forcer l\'énumération HID à chaque lancement')
+    parser.add_argument('--argv', default='--left 0 --right 0 --duration 0 --quiet',
+                        help='Arguments passés à parse_args()')
+    parser.add_argument('--python', default=sys.executable, help='Interpréteur à utiliser')
+    args = parser.parse_args()
+    
+    code = CHILD.format(here=HERE, argv=args.argv.split(), mock=args.mock,
+                        use_cache=not args.no_cache)
+    
+    print("=" * 60)
+    print("Benchmark démarrage - vibration.py")
+    print(f"Runs: {args.runs}  Mock: {args.mock}  Cache: {not args.no_cache}")
+    print("=" * 60)
+    
+    samples = []
+    for _ in range(args.runs):
+        try:
+            samples.append(run_once(args.python, code))
+        except RuntimeError as e:
+            print(f"[!] Erreur du processus enfant:\n{e}")
+            return 1
+    
+    failed = sum(1 for s in samples if not s['ok'])
+    if failed:
+        print(f"[!] {failed}/{len(samples)} lancements sans connexion/paquet "
+              f"(manette absente ? essayez --mock)")
+    
+    print(f"\n{'Phase':<10}{'min':>10}{'médiane':>10}{'max':>10}   (ms)")
+    for phase in PHASES:
+        values = [s[phase] * 1000 for s in samples]
+        print(f"{phase:<10}{min(values):>10.2f}{statistics.median(values):>10.2f}"
+              f"{max(values):>10.2f}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
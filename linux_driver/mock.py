@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Faux périphériques HID pour tester le driver sans manette branchée.
+
+MockDevice applique la sémantique du masque moteurs (byte 5) comme la
+manette: seuls les moteurs dont le bit est à 1 prennent la valeur du paquet,
+les autres gardent leur état. Chaque écriture est enregistrée avec les
+changements qu'elle a provoqués.
+
+Usage:
+    from vibration import TurtleBeachController
+    from mock import MockDevice
+
+    controller = TurtleBeachController()
+    controller.device = MockDevice()   # à la place de connect()
+    controller.vibrate_triggers(left_trigger=50)
+    print(controller.device.state, controller.device.changes[-1])
+
+    # Vérification du masque, du watchdog, du streaming et du débit adaptatif:
+    python mock.py
+"""
+
+import io
+import sys
+import threading
+import time
+
+import protocol
+
+# Canaux dans l'ordre des bytes 6 à 9, avec leur bit dans le masque
+CHANNELS = (
+    ('left_trigger', 0x01),
+    ('right_trigger', 0x02),
+    ('left', 0x04),
+    ('right', 0x08),
+)
+
+
+class MockDevice:
+    """Imite un hid.device: enregistre les paquets et l'état des moteurs."""
+
+    def __init__(self, product_string: str = "Mock Turtle Beach Controller"):
+        self.product_string = product_string
+        self.packets = []  # Paquets reçus, dans l'ordre d'écriture
+        self.changes = []  # Par paquet: {canal: (ancienne, nouvelle)}
+        self.state = {name: 0 for name, _ in CHANNELS}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def set_nonblocking(self, enable: int):
+        pass
+
+    def get_product_string(self) -> str:
+        return self.product_string
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise OSError("device closed")
+        data = bytes(data)
+        with self._lock:
+            self.packets.append(data)
+            self.changes.append(self._apply(data))
+        return len(data)
+
+    def close(self):
+        self.closed = True
+
+    def _apply(self, data: bytes) -> dict:
+        """Applique un paquet de vibration à l'état selon son masque."""
+        packet = protocol.try_decode(data)
+        if packet is None:
+            return {}
+        mask = packet.mask
+        changed = {}
+        for (name, bit), value in zip(CHANNELS, packet[2:]):
+            if mask & bit and self.state[name] != value:
+                changed[name] = (self.state[name], value)
+                self.state[name] = value
+        return changed
+
+
+class ThrottledMockDevice(MockDevice):
+    """
+    Périphérique lent: une file de `queue_size` paquets vidée à `drain_rate`/s.
+    
+    Comme hidraw, write() bloque quand la file est pleine, jusqu'à ce qu'une
+    place se libère; il échoue (-1) si l'attente dépasserait `timeout`.
+    Chaque écriture coûte au moins `latency` secondes (transfert USB).
+    """
+
+    def __init__(self, drain_rate: float = 150, queue_size: int = 8,
+                 latency: float = 0.0005, timeout: float = 0.05, **kwargs):
+        super().__init__(**kwargs)
+        self.drain_rate = drain_rate
+        self.queue_size = queue_size
+        self.latency = latency
+        self.timeout = timeout
+        self.rejected = 0  # Écritures refusées (file pleine trop longtemps)
+        self._queued = 0.0
+        self._last = time.perf_counter()
+
+    def _drain(self):
+        now = time.perf_counter()
+        self._queued = max(0.0, self._queued - (now - self._last) * self.drain_rate)
+        self._last = now
+
+    def write(self, data) -> int:
+        self._drain()
+        wait = (self._queued + 1 - self.queue_size) / self.drain_rate
+        if wait > self.timeout:
+            self.rejected += 1
+            return -1
+        time.sleep(max(wait, 0) + self.latency)
+        self._drain()
+        self._queued += 1
+        return super().write(data)
+
+
+def _check(label: str, ok: bool) -> bool:
+    print(f"  {'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def main():
+    """Vérifie la sémantique du masque moteurs avec un MockDevice."""
+    from vibration import TurtleBeachController
+
+    print("=" * 60)
+    print("Vérification du masque moteurs (MockDevice)")
+    print("=" * 60)
+
+    controller = TurtleBeachController(verbose=False)
+    device = controller.device = MockDevice()
+    results = []
+
+    controller.vibrate(left=40, right=30, left_trigger=20, right_trigger=10)
+    results.append(_check("vibrate() met à jour les 4 moteurs",
+                          len(device.changes[-1]) == 4))
+
+    controller.vibrate_triggers(left_trigger=70)
+    results.append(_check("vibrate_triggers() ne touche que les gâchettes",
+                          device.changes[-1] == {'left_trigger': (20, 70),
+                                                 'right_trigger': (10, 0)}))
+    results.append(_check("masque 0x03 envoyé", device.packets[-1][5] == 0x03))
+
+    controller.vibrate_motors(left=90)
+    results.append(_check("vibrate_motors() ne touche que les moteurs principaux",
+                          device.changes[-1] == {'left': (40, 90), 'right': (30, 0)}))
+    results.append(_check("masque 0x0C envoyé", device.packets[-1][5] == 0x0C))
+    results.append(_check("état final cohérent",
+                          device.state == {'left_trigger': 70, 'right_trigger': 0,
+                                           'left': 90, 'right': 0}))
+
+    # Deux producteurs indépendants, sans verrou ni état partagé côté appelant
+    def producer(send, values):
+        for value in values:
+            send(value)
+
+    triggers = threading.Thread(target=producer, args=(
+        lambda v: controller.vibrate_triggers(v, v), range(0, 101)))
+    motors = threading.Thread(target=producer, args=(
+        lambda v: controller.vibrate_motors(v, v), range(100, -1, -1)))
+    triggers.start()
+    motors.start()
+    triggers.join()
+    motors.join()
+    results.append(_check("producteurs concurrents: chacun garde sa dernière valeur",
+                          device.state == {'left_trigger': 100, 'right_trigger': 100,
+                                           'left': 0, 'right': 0}))
+    sequences = [p[2] for p in device.packets]
+    results.append(_check("séquence continue malgré la concurrence",
+                          all((b - a) & 0xFF == 1 for a, b in zip(sequences, sequences[1:]))))
+
+    controller.stop_vibration()
+    results.append(_check("stop_vibration() arrête tout",
+                          not any(device.state.values())))
+
+    results += check_watchdog()
+    results += check_stream()
+    results += check_adaptive_rate()
+
+    print(f"\n{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+def check_watchdog(tick: float = 0.005) -> list:
+    """Vérifie le watchdog: expiration, réarmement, TTL par masque, fermeture."""
+    from vibration import TurtleBeachController
+    from watchdog import TimerWheel, Watchdog
+
+    print("\nWatchdog (MockDevice)")
+    watchdog = Watchdog(default_ttl=0.03, tick=tick)
+    results = []
+
+    def pad():
+        controller = TurtleBeachController(verbose=False, watchdog=watchdog)
+        controller.device = MockDevice()
+        return controller, controller.device
+
+    def stops(device):
+        return [p for p in device.packets if not any(protocol.try_decode(p)[2:])]
+
+    controller, device = pad()
+    controller.vibrate(left=50, right=50, ttl=0.03)
+    time.sleep(0.1)
+    results.append(_check("TTL expiré: un seul paquet d'arrêt",
+                          len(stops(device)) == 1 and len(device.packets) == 2
+                          and not any(device.state.values())))
+
+    controller, device = pad()
+    controller.vibrate(left=50, ttl=0.1)
+    time.sleep(0.05)
+    controller.vibrate(left=60, ttl=0.1)
+    time.sleep(0.07)  # Après la première échéance, avant la seconde
+    results.append(_check("réarmé avant l'échéance: aucun arrêt",
+                          not stops(device) and device.state['left'] == 60))
+    controller.stop_vibration()
+
+    controller, device = pad()
+    controller.vibrate(left=50, ttl=0)
+    time.sleep(0.08)
+    results.append(_check("ttl=0: pas d'expiration",
+                          not stops(device) and device.state['left'] == 50))
+    controller.stop_vibration()
+
+    controller, device = pad()
+    controller.vibrate_motors(left=60, ttl=0)
+    controller.vibrate_triggers(40, 40, ttl=0.03)
+    time.sleep(0.1)
+    results.append(_check("expiration des gâchettes: masque 0x03 seul",
+                          [p[5] for p in stops(device)] == [0x03]
+                          and device.state == {'left_trigger': 0, 'right_trigger': 0,
+                                               'left': 60, 'right': 0}))
+    controller.stop_vibration()
+
+    handle = watchdog.wheel.schedule(0.01, lambda handle: None)
+    time.sleep(0.05)
+    results.append(_check("cancel() après expiration retourne False",
+                          watchdog.cancel(handle) is False))
+
+    watchdog.close()
+    controller, device = pad()
+    refused = controller.vibrate(left=50)
+    stopped = controller.stop_vibration()
+    results.append(_check("watchdog fermé: état à TTL refusé sans exception",
+                          refused is False and stopped is True
+                          and len(device.packets) == 1))
+
+    # Armer/annuler en O(1): même coût avec 100 ou 100 000 échéances en attente
+    def cost(pending: int, ops: int = 5000) -> float:
+        wheel = TimerWheel(tick=1.0)
+        for i in range(pending):
+            wheel.schedule(60 + i % 400, lambda handle: None)
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            for i in range(ops):
+                wheel.cancel(wheel.schedule(60 + i % 400, lambda handle: None))
+            best = min(best, time.perf_counter() - start)
+        wheel.close()
+        return best / ops
+
+    small, large = cost(100), cost(100_000)
+    print(f"    armer+annuler: {small * 1e6:.2f}µs (100 en attente), "
+          f"{large * 1e6:.2f}µs (100 000 en attente)")
+    results.append(_check("armer/annuler en temps constant", large < 3 * small))
+    return results
+
+
+class RefusingMockDevice(MockDevice):
+    """Périphérique qui refuse ses `refusals` premières écritures (-1)."""
+
+    def __init__(self, refusals: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.refusals = refusals
+
+    def write(self, data) -> int:
+        if self.refusals > 0:
+            self.refusals -= 1
+            return -1
+        return super().write(data)
+
+
+def check_stream() -> list:
+    """Vérifie run_stream(): fusion, sous-alimentation, échecs et arrêt."""
+    import stream
+    from vibration import TurtleBeachController
+
+    print("\nStreaming (run_stream sur MockDevice)")
+    results = []
+
+    def play(device, frames, **kwargs):
+        controller = TurtleBeachController(verbose=False)
+        controller.device = device
+        try:
+            return controller, stream.run_stream(controller, frames, **kwargs)
+        finally:
+            controller.disconnect(stop=False)
+
+    def is_stop(packet):
+        decoded = protocol.try_decode(packet)
+        return decoded is not None and not any(decoded[2:])
+
+    # États de 1 ms, plus courts qu'un créneau à 100/s: fusionnés
+    device = MockDevice()
+    frames = [(0.001, v, v, 0, 0) for v in range(10, 60, 10)] + [(0.05, 80, 80, 0, 0)]
+    _, stats = play(device, iter(frames), rate=100)
+    results.append(_check("états plus courts qu'un créneau fusionnés",
+                          stats['coalesced'] == 4 and stats['sent'] == 2))
+    results.append(_check("un seul paquet d'arrêt après disconnect(stop=False)",
+                          sum(map(is_stop, device.packets)) == 1
+                          and is_stop(device.packets[-1])))
+
+    # Producteur plus lent que la lecture: chaque état démarre en retard
+    def slow_frames():
+        for value in (20, 40, 60):
+            time.sleep(0.03)
+            yield (0.01, value, value, 0, 0)
+
+    _, stats = play(MockDevice(), slow_frames(), rate=100)
+    results.append(_check("sous-alimentation comptée", stats['underruns'] == 2))
+
+    # Écriture refusée (deux tentatives): renvoyée au prochain état identique
+    device = RefusingMockDevice(refusals=2)
+    _, stats = play(device, iter([(0.02, 50, 50, 0, 0)] * 2), rate=100)
+    results.append(_check("échec compté puis renvoi réussi",
+                          stats['failed'] == 1 and stats['sent'] == 1
+                          and protocol.try_decode(device.packets[0]).left == 50))
+
+    # Flux binaire tronqué: erreur remontée, manette arrêtée
+    device = MockDevice()
+    data = stream.BINARY_RECORD.pack(20, 70, 70, 0, 0) + b'\x01\x02'
+    try:
+        play(device, stream.iter_binary_frames(io.BytesIO(data)))
+        truncated = False
+    except ValueError as e:
+        truncated = 'tronqué' in str(e)
+    results.append(_check("flux binaire tronqué signalé",
+                          truncated and protocol.try_decode(device.packets[0]).left == 70))
+    results.append(_check("manette arrêtée après un flux tronqué",
+                          not any(device.state.values())))
+
+    # Ligne texte invalide: même comportement
+    device = MockDevice()
+    try:
+        play(device, stream.iter_text_frames(io.StringIO("10 50 50\nbad\n")))
+        failed = False
+    except ValueError:
+        failed = True
+    results.append(_check("erreur de syntaxe signalée et manette arrêtée",
+                          failed and len(device.packets) == 2
+                          and not any(device.state.values())))
+    return results
+
+
+def check_adaptive_rate(drain_rate: float = 150, duration: float = 3.0,
+                        argv=('--stream', '-', '--adaptive', '--rate', '500')) -> list:
+    """
+    Vérifie que le débit adaptatif converge vers celui d'un périphérique lent.
+    
+    Le contrôle de débit est construit comme par le CLI (mêmes défauts).
+    """
+    from vibration import TurtleBeachController, adaptive_rate, parse_args
+
+    print(f"\nDébit adaptatif (périphérique limité à {drain_rate:.0f} paquets/s, "
+          f"{duration:.0f}s, {' '.join(argv[2:])})")
+    controller = TurtleBeachController(verbose=False)
+    device = controller.device = ThrottledMockDevice(drain_rate=drain_rate)
+    controller.rate_control = adaptive_rate(parse_args(list(argv)))
+
+    start = time.perf_counter()
+    next_send = start
+    rates = []
+    while next_send - start < duration:
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        controller.vibrate(left=50)
+        rates.append((time.perf_counter() - start, controller.current_rate))
+        next_send = max(next_send + controller.rate_control.period, time.perf_counter())
+
+    # Débit moyen sur la seconde finale, une fois le régime atteint
+    settled = [rate for t, rate in rates if t > duration - 1]
+    average = sum(settled) / len(settled)
+    accepted = sum(1 for t, _ in rates if t > duration - 1)
+    control = controller.rate_control
+    print(f"    débit final {control.rate:.0f}/s, moyen {average:.0f}/s, "
+          f"accepté {accepted}/s, {control.congestions} diminutions, "
+          f"{device.rejected} refus")
+
+    return [
+        _check("débit stabilisé près de la capacité du périphérique",
+               0.6 * drain_rate <= average <= 1.25 * drain_rate),
+        _check("le périphérique est utilisé à plus de 60%",
+               accepted >= 0.6 * drain_rate),
+        _check("débit dans les bornes configurées",
+               all(control.min_rate <= rate <= control.max_rate for _, rate in rates)),
+    ]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
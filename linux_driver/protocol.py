@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Codec du protocole de vibration Turtle Beach (13 bytes).
+
+Module unique utilisé par le driver, le moniteur usbmon, le faux périphérique
+et les scripts d'analyse. Le format est précompilé une fois pour toutes dans
+un struct.Struct.
+
+Format (voir docs/PROTOCOL.md):
+    09 00 [SEQ] 09 00 [MASK] [LT] [RT] [LEFT] [RIGHT] FF 00 EB
+
+Usage:
+    import protocol
+    data = protocol.encode(sequence=1, left=50, right=50)
+    packet = protocol.decode(data)          # VibrationPacket
+    print(packet.left, packet.right)
+    for packet in protocol.iter_decode(capture_bytes):
+        ...
+
+    # Vérification aller-retour + débit:
+    python protocol.py
+"""
+
+import struct
+import sys
+
+REPORT_ID = 0x09
+SUB_COMMAND = 0x09
+SUFFIX = b'\xff\x00\xeb'
+MAX_INTENSITY = 100  # Intensité max acceptée par la manette
+
+# Masque des moteurs (byte 5)
+MASK_LEFT_TRIGGER = 0x01
+MASK_RIGHT_TRIGGER = 0x02
+MASK_LEFT = 0x04
+MASK_RIGHT = 0x08
+MASK_TRIGGERS = MASK_LEFT_TRIGGER | MASK_RIGHT_TRIGGER  # 0x03
+MASK_MOTORS = MASK_LEFT | MASK_RIGHT                    # 0x0C
+MASK_ALL = MASK_TRIGGERS | MASK_MOTORS                  # 0x0F
+
+# Report ID, 00, SEQ, sub-command, 00, MASK, LT, RT, L, R, suffixe
+PACKET = struct.Struct('10B3s')
+PACKET_SIZE = PACKET.size  # 13
+
+
+class VibrationPacket(tuple):
+    """
+    Paquet décodé: (sequence, mask, left_trigger, right_trigger, left, right).
+    
+    Équivalent d'un namedtuple, sans importer collections (~4ms au démarrage).
+    """
+    
+    __slots__ = ()
+    
+    sequence = property(lambda self: self[0])
+    mask = property(lambda self: self[1])
+    left_trigger = property(lambda self: self[2])
+    right_trigger = property(lambda self: self[3])
+    left = property(lambda self: self[4])
+    right = property(lambda self: self[5])
+    
+    def __repr__(self):
+        return ("VibrationPacket(sequence={}, mask=0x{:02X}, left_trigger={}, "
+                "right_trigger={}, left={}, right={})".format(*self))
+
+
+def encode(sequence: int, left: int = 0, right: int = 0, left_trigger: int = 0,
+           right_trigger: int = 0, mask: int = MASK_ALL) -> bytes:
+    """
+    Encode une commande de vibration.
+    
+    Les valeurs ne sont pas bornées ici (voir TurtleBeachController);
+    une valeur hors de 0-255 lève struct.error.
+    """
+    return PACKET.pack(REPORT_ID, 0x00, sequence, SUB_COMMAND, 0x00, mask,
+                       left_trigger, right_trigger, left, right, SUFFIX)
+
+
+def _check(fields, strict: bool):
+    """Retourne la raison pour laquelle des champs bruts sont invalides, ou None."""
+    report_id, reserved1, _seq, sub, reserved2, mask, lt, rt, left, right, suffix = fields
+    if report_id != REPORT_ID or sub != SUB_COMMAND:
+        return f"en-tête inattendu ({report_id:02x} .. {sub:02x})"
+    if suffix != SUFFIX:
+        return f"suffixe inattendu ({suffix.hex()})"
+    if strict:
+        if reserved1 or reserved2:
+            return "bytes réservés non nuls"
+        if mask & ~MASK_ALL:
+            return f"masque invalide (0x{mask:02X})"
+        if max(lt, rt, left, right) > MAX_INTENSITY:
+            return f"intensité > {MAX_INTENSITY}"
+    return None
+
+
+def validate(data: bytes, strict: bool = False):
+    """
+    Vérifie qu'un buffer est un paquet de vibration.
+    
+    Args:
+        data: Paquet de 13 bytes
+        strict: Vérifie aussi bytes réservés, masque et intensités (0-100)
+    
+    Raises:
+        ValueError: Paquet invalide (la raison est indiquée).
+    """
+    if len(data) != PACKET_SIZE:
+        raise ValueError(f"taille {len(data)} au lieu de {PACKET_SIZE}")
+    reason = _check(PACKET.unpack(data), strict)
+    if reason:
+        raise ValueError(reason)
+
+
+def is_vibration_packet(data: bytes, strict: bool = False) -> bool:
+    """Comme validate(), mais retourne un booléen."""
+    return (len(data) == PACKET_SIZE
+            and _check(PACKET.unpack(data), strict) is None)
+
+
+def decode(data: bytes, strict: bool = False) -> VibrationPacket:
+    """
+    Décode un paquet de vibration.
+    
+    Les bytes après les 13 premiers sont ignorés (rapports HID complétés).
+    
+    Raises:
+        ValueError: Paquet trop court ou invalide.
+    """
+    if len(data) < PACKET_SIZE:
+        raise ValueError(f"taille {len(data)} < {PACKET_SIZE}")
+    fields = PACKET.unpack_from(data)
+    reason = _check(fields, strict)
+    if reason:
+        raise ValueError(reason)
+    return VibrationPacket((fields[2],) + fields[5:10])
+
+
+def try_decode(data: bytes):
+    """Décode un paquet, ou retourne None si ce n'en est pas un."""
+    if len(data) < PACKET_SIZE:
+        return None
+    fields = PACKET.unpack_from(data)
+    if _check(fields, False):
+        return None
+    return VibrationPacket((fields[2],) + fields[5:10])
+
+
+def iter_decode(data: bytes, strict: bool = False):
+    """
+    Décode en masse des paquets concaténés (struct.iter_unpack).
+    
+    Raises:
+        ValueError: Taille non multiple de 13 ou paquet invalide (avec son index).
+    """
+    if len(data) % PACKET_SIZE:
+        raise ValueError(f"taille {len(data)} non multiple de {PACKET_SIZE}")
+    for index, fields in enumerate(PACKET.iter_unpack(data)):
+        reason = _check(fields, strict)
+        if reason:
+            raise ValueError(f"paquet {index}: {reason}")
+        yield VibrationPacket((fields[2],) + fields[5:10])
+
+
+def main():
+    """Vérifie l'aller-retour encode/decode et mesure le débit du codec."""
+    import time
+    
+    print("=" * 60)
+    print("Codec protocole de vibration - vérification et débit")
+    print("=" * 60)
+    
+    # Aller-retour sur tout l'espace des séquences et masques
+    errors = 0
+    for seq in range(256):
+        for mask in range(16):
+            values = (seq * 7 % 101, seq * 13 % 101, seq % 101, (255 - seq) % 101)
+            packet = decode(encode(seq, values[2], values[3], values[0], values[1], mask),
+                            strict=True)
+            if packet != (seq, mask) + values:
+                errors += 1
+    print(f"  {'✓' if not errors else '✗'} aller-retour: {256 * 16 - errors}/{256 * 16}")
+    
+    # Paquets réels de docs/PROTOCOL.md
+    sample = bytes.fromhex('09002b09000f00006464ff00eb')
+    ok = decode(sample) == (0x2b, 0x0F, 0, 0, 100, 100)
+    print(f"  {'✓' if ok else '✗'} décodage capture: {decode(sample)}")
+    errors += not ok
+    
+    n = 200000
+    start = time.perf_counter()
+    for i in range(n):
+        encode(i & 0xFF, 50, 50)
+    elapsed = time.perf_counter() - start
+    print(f"\n  encode:      {n / elapsed / 1e6:6.2f} M paquets/s")
+    
+    start = time.perf_counter()
+    for _ in range(n):
+        decode(sample)
+    elapsed = time.perf_counter() - start
+    print(f"  decode:      {n / elapsed / 1e6:6.2f} M paquets/s")
+    
+    bulk = b''.join(encode(i & 0xFF, i % 101, 0) for i in range(n))
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_decode(bulk))
+    elapsed = time.perf_counter() - start
+    print(f"  iter_decode: {count / elapsed / 1e6:6.2f} M paquets/s")
+    
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Contrôle adaptatif du débit d'envoi (AIMD) selon la contre-pression du périphérique.
+
+Le débit réellement accepté par la manette n'est pas connu. Le contrôleur
+mesure la durée de chaque write() et ses échecs:
+    - écriture réussie et rapide: augmentation additive (+increase paquets/s
+      par seconde environ, comme TCP: +increase/rate à chaque paquet)
+    - écriture en échec, ou latence lissée nettement au-dessus de la latence
+      de base (file du noyau/périphérique pleine): diminution multiplicative
+Le débit oscille ainsi juste sous le maximum soutenable, dans [min_rate, max_rate].
+
+Par défaut, le débit part de max_rate et redescend dès la première
+congestion: une manette rapide est servie à plein débit dès le premier
+paquet. Si un débit de départ plus bas est choisi, il double environ chaque
+seconde jusqu'à la première congestion (slow start).
+
+Usage:
+    from ratecontrol import AdaptiveRate
+    controller.rate_control = AdaptiveRate(min_rate=20, max_rate=250)
+    ...
+    print(controller.current_rate)
+"""
+
+import time
+
+
+class AdaptiveRate:
+    """Débit d'envoi adaptatif, alimenté par les mesures de write()."""
+    
+    def __init__(self, min_rate: float = 10, max_rate: float = 250,
+                 initial_rate: float = None, increase: float = 20,
+                 decrease: float = 0.7, latency_factor: float = 2.0,
+                 latency_slack: float = 0.002, smoothing: float = 0.25,
+                 hold: float = 0.25, base_window: int = 256):
+        """
+        Args:
+            min_rate: Débit minimum (paquets/s)
+            max_rate: Débit maximum (paquets/s)
+            initial_rate: Débit de départ (défaut: max_rate)
+            increase: Augmentation additive, en paquets/s par seconde
+            decrease: Facteur multiplicatif appliqué en cas de congestion
+            latency_factor: Une latence lissée au-delà de
+                latence_de_base * latency_factor + latency_slack est une congestion
+            latency_slack: Marge absolue (s) pour ignorer la gigue des petites latences
+            smoothing: Poids d'une nouvelle mesure dans la latence lissée (EWMA):
+                un write() isolé plus lent (ordonnanceur, GIL) n'est pas une congestion
+            hold: Délai minimum (s) entre deux diminutions, le temps que la
+                file se vide après une baisse
+            base_window: Nombre d'écritures sur lequel la latence de base est réévaluée
+        """
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("il faut 0 < min_rate <= max_rate")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_slack = latency_slack
+        self.smoothing = smoothing
+        self.hold = hold
+        self.base_window = base_window
+        
+        self.rate = min(max(initial_rate or max_rate, min_rate), max_rate)
+        self.base_latency = None  # Plus petite latence récente (s)
+        self.latency = None  # Latence lissée (s)
+        self.writes = 0
+        self.failures = 0
+        self.congestions = 0  # Diminutions appliquées
+        self.slow_start = True  # Croissance exponentielle avant la 1re congestion
+        self._epoch_min = None
+        self._epoch_count = 0
+        self._last_decrease = float('-inf')
+    
+    @property
+    def period(self) -> float:
+        """Intervalle courant entre deux envois (s)."""
+        return 1.0 / self.rate
+    
+    def record(self, latency: float, ok: bool = True):
+        """
+        Prend en compte une écriture.
+        
+        Args:
+            latency: Durée de l'appel write() en secondes
+            ok: False si l'écriture a échoué
+        """
+        self.writes += 1
+        if not ok:
+            self.failures += 1
+            self._on_congestion()
+            return
+        
+        self._update_base(latency)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+        
+        if self.latency > self.base_latency * self.latency_factor + self.latency_slack:
+            self._on_congestion()
+        elif self.slow_start:
+            # +ln(2) par paquet: le débit double à peu près chaque seconde
+            self.rate = min(self.max_rate, self.rate + 0.69)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+    
+    def _update_base(self, latency: float):
+        """Latence de base = minimum glissant par époques de base_window écritures."""
+        if self._epoch_min is None or latency < self._epoch_min:
+            self._epoch_min = latency
+        if self.base_latency is None or latency < self.base_latency:
+            self.base_latency = latency
+        
+        self._epoch_count += 1
+        if self._epoch_count >= self.base_window:
+            # Oublie les anciens minima (changement de bus, de périphérique...)
+            self.base_latency = self._epoch_min
+            self._epoch_min = None
+            self._epoch_count = 0
+    
+    def _on_congestion(self):
+        """
+        Diminue le débit, au plus une fois par `hold`: la file met un moment
+        à se vider après une baisse. Si elle est toujours pleine ensuite, le
+        débit est encore trop haut et baisse à nouveau.
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < self.hold:
+            return
+        self._last_decrease = now
+        self.slow_start = False
+        self.congestions += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Mode flux: exécute une séquence de vibrations lue sur stdin ou dans un fichier.
+
+Toute la séquence passe par une seule connexion à la manette. Chaque état
+moteur est planifié sur une échéance absolue (pas de dérive), l'envoi est
+limité à `rate` paquets/s et les états trop courts pour un créneau d'envoi
+sont fusionnés. Le lecteur et le planificateur communiquent par une file
+bornée: un générateur trop rapide est bloqué (backpressure), un générateur
+trop lent ne fait que retarder la séquence (underrun).
+
+Format texte (une ligne par état, '#' pour les commentaires):
+    DURÉE_MS LEFT RIGHT [LT RT]
+
+    # rampe puis arrêt
+    100 20 20
+    100 60 60
+    250 100 100 30 30
+    0 0 0
+
+Format binaire (--binary), enregistrements de 6 bytes little-endian:
+    uint16 DURÉE_MS, uint8 LEFT, uint8 RIGHT, uint8 LT, uint8 RT
+
+Avec --adaptive, le débit n'est plus fixe: il s'adapte à la contre-pression
+mesurée sur la manette entre --min-rate et --rate (voir ratecontrol.py).
+
+Usage:
+    python vibration.py --stream sequence.txt
+    ./generateur | python vibration.py --stream - --rate 125
+    ./generateur | python vibration.py --stream - --adaptive --rate 500
+"""
+
+import queue
+import struct
+import threading
+import time
+
+DEFAULT_RATE = 100  # Paquets/s max envoyés à la manette
+QUEUE_SIZE = 256    # États en attente avant de bloquer le producteur
+
+BINARY_RECORD = struct.Struct('<HBBBB')
+
+_END = object()  # Marqueur de fin de flux
+
+
+def iter_text_frames(stream):
+    """
+    Lit des états au format texte.
+    
+    Yields:
+        (durée_s, left, right, left_trigger, right_trigger)
+    
+    Raises:
+        ValueError: Ligne mal formée (le numéro de ligne est indiqué).
+    """
+    for lineno, line in enumerate(stream, 1):
+        fields = line.split('#', 1)[0].replace(',', ' ').split()
+        if not fields:
+            continue
+        if len(fields) not in (3, 5):
+            raise ValueError(f"ligne {lineno}: attendu 'DURÉE_MS LEFT RIGHT [LT RT]'")
+        try:
+            duration_ms, left, right, *triggers = (int(f) for f in fields)
+        except ValueError:
+            raise ValueError(f"ligne {lineno}: valeur non entière") from None
+        if duration_ms < 0:
+            raise ValueError(f"ligne {lineno}: durée négative")
+        left_trigger, right_trigger = triggers or (0, 0)
+        yield duration_ms / 1000, left, right, left_trigger, right_trigger
+
+
+def iter_binary_frames(stream):
+    """
+    Lit des états au format binaire compact (enregistrements de 6 bytes).
+    
+    Yields:
+        (durée_s, left, right, left_trigger, right_trigger)
+    """
+    size = BINARY_RECORD.size
+    read = getattr(stream, 'read1', stream.read)  # read1: pas d'attente sur un pipe
+    pending = b''
+    while True:
+        chunk = read(size * 64)
+        if not chunk:
+            break
+        pending += chunk
+        usable = len(pending) - len(pending) % size
+        for duration_ms, left, right, lt, rt in BINARY_RECORD.iter_unpack(pending[:usable]):
+            yield duration_ms / 1000, left, right, lt, rt
+        pending = pending[usable:]
+    
+    if pending:
+        raise ValueError(f"flux binaire tronqué ({len(pending)} bytes en trop)")
+
+
+def _read_into(frames, fifo: queue.Queue, errors: list):
+    """Thread lecteur: pousse les états dans la file (bloque si elle est pleine)."""
+    try:
+        for frame in frames:
+            fifo.put(frame)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        fifo.put(_END)
+
+
+def run_stream(controller, frames, rate: float = DEFAULT_RATE,
+               queue_size: int = QUEUE_SIZE) -> dict:
+    """
+    Joue une séquence d'états sur une manette déjà connectée.
+    
+    La manette est arrêtée en fin de séquence (et sur erreur): l'appelant
+    peut ensuite se déconnecter avec disconnect(stop=False).
+    
+    Args:
+        controller: TurtleBeachController connecté
+        frames: Itérable de (durée_s, left, right, left_trigger, right_trigger)
+        rate: Nombre maximum de paquets envoyés par seconde (ignoré si
+            controller.rate_control est défini: son débit courant est utilisé)
+        queue_size: Taille de la file entre lecteur et planificateur
+    
+    Returns:
+        Statistiques: frames, sent, failed (envois refusés), coalesced,
+        underruns, max_late_ms, elapsed, rate (débit final)
+    
+    Raises:
+        ValueError: Erreur de lecture du flux (remontée du thread lecteur).
+    """
+    period = 1.0 / rate
+    fifo = queue.Queue(maxsize=queue_size)
+    errors = []
+    reader = threading.Thread(target=_read_into, args=(frames, fifo, errors),
+                              daemon=True)
+    reader.start()
+    
+    stats = {'frames': 0, 'sent': 0, 'failed': 0, 'coalesced': 0, 'underruns': 0,
+             'max_late_ms': 0.0, 'elapsed': 0.0, 'rate': rate}
+    try:
+        _schedule(controller, fifo, period, stats)
+    finally:
+        # Arrêt garanti, y compris sur erreur de flux ou Ctrl+C
+        controller.stop_vibration()
+    if controller.rate_control is not None:
+        stats['rate'] = controller.rate_control.rate
+    
+    if errors:
+        raise ValueError(str(errors[0]))
+    return stats
+
+
+def _schedule(controller, fifo: queue.Queue, period: float, stats: dict):
+    """Planificateur: joue les états de la file sur leurs échéances."""
+    last_state = None
+    last_send = float('-inf')
+    start = t0 = None
+    
+    while True:
+        try:
+            frame = fifo.get_nowait()
+        except queue.Empty:
+            frame = fifo.get()
+            if frame is not _END and start is not None and time.perf_counter() > start:
+                # Le producteur n'a pas suivi: l'état démarre en retard
+                stats['underruns'] += 1
+                start = time.perf_counter()
+        if frame is _END:
+            break
+        if start is None:
+            start = t0 = time.perf_counter()
+        
+        stats['frames'] += 1
+        duration, *state = frame
+        if controller.rate_control is not None:
+            period = controller.rate_control.period
+        end = start + duration
+        
+        send_at = max(start, last_send + period)
+        if send_at >= end:
+            # État plus court qu'un créneau d'envoi: fusionné avec le suivant
+            stats['coalesced'] += 1
+        else:
+            delay = send_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if state != last_state:
+                late = time.perf_counter() - start
+                stats['max_late_ms'] = max(stats['max_late_ms'], late * 1000)
+                if controller.vibrate(*state):
+                    last_state = state
+                    stats['sent'] += 1
+                else:
+                    stats['failed'] += 1  # Renvoyé au prochain état identique
+                last_send = time.perf_counter()
+        
+        start = end
+    
+    # Tenir le dernier état jusqu'à son échéance
+    if start is not None:
+        delay = start - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        stats['elapsed'] = time.perf_counter() - t0
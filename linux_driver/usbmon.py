@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Moniteur USB en direct sous Linux via l'interface binaire usbmon.
+
+Lit /dev/usbmonN (un bus USB), ne garde que le trafic de la manette,
+décode les paquets de vibration au fil de l'eau et affiche:
+    - le débit glissant (paquets/s)
+    - les trous dans les numéros de séquence (paquets perdus/dupliqués)
+    - la latence entre le write() du driver et l'apparition sur le fil
+      (avec --stream, quand le driver tourne dans le même processus)
+
+Un dump enregistré (--record, ou `cat /dev/usbmonN > dump.bin`) peut être
+rejoué à la place du périphérique avec --replay.
+
+Prérequis:
+    sudo modprobe usbmon
+    # /dev/usbmonN est lisible par root uniquement par défaut
+
+Usage:
+    sudo python usbmon.py                      # manette détectée via sysfs
+    sudo python usbmon.py --record dump.bin
+    sudo python usbmon.py --stream sequence.txt  # + latence write() -> fil
+    python usbmon.py --replay dump.bin
+    python usbmon.py --check                   # vérification sur un dump synthétique
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+import protocol
+from vibration import PRODUCT_ID, USB_DEVICES, VENDOR_ID
+
+# En-tête binaire usbmon renvoyé par read() (struct usbmon_packet, 48 bytes),
+# suivi de len_cap bytes de données
+USBMON_HEADER = struct.Struct('=QBBBBHccqiiII8s')
+
+XFER_ISO, XFER_INTERRUPT, XFER_CONTROL, XFER_BULK = range(4)
+DIR_IN = 0x80  # Bit de direction dans epnum
+
+
+UsbmonEvent = namedtuple('UsbmonEvent', [
+    'urb_id', 'type', 'xfer_type', 'epnum', 'devnum', 'busnum',
+    'timestamp', 'status', 'length', 'setup', 'data',
+])
+
+
+def pack_event(event: UsbmonEvent) -> bytes:
+    """Sérialise un événement au format binaire usbmon (pour fabriquer des dumps)."""
+    sec = int(event.timestamp)
+    usec = int(round((event.timestamp - sec) * 1e6))
+    flag_setup = b'\0' if event.setup else b'-'
+    flag_data = b'\0' if event.data else b'<'
+    return USBMON_HEADER.pack(
+        event.urb_id, ord(event.type), event.xfer_type, event.epnum,
+        event.devnum, event.busnum, flag_setup, flag_data, sec, usec,
+        event.status, event.length, len(event.data), event.setup or bytes(8),
+    ) + event.data
+
+
+class UsbmonParser:
+    """
+    Parser incrémental du flux binaire usbmon.
+    
+    Accepte des morceaux de taille quelconque (lecture du périphérique,
+    fichier, pipe...) et rend les événements complets au fur et à mesure.
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+    
+    def feed(self, chunk: bytes) -> list:
+        """Ajoute des bytes et retourne les événements complets décodés."""
+        buffer = self._buffer
+        buffer += chunk
+        header_size = USBMON_HEADER.size
+        events = []
+        offset = 0
+        
+        while len(buffer) - offset >= header_size:
+            (urb_id, ev_type, xfer_type, epnum, devnum, busnum, flag_setup,
+             _flag_data, sec, usec, status, length, len_cap,
+             setup) = USBMON_HEADER.unpack_from(buffer, offset)
+            end = offset + header_size + len_cap
+            if len(buffer) < end:
+                break
+            
+            events.append(UsbmonEvent(
+                urb_id, chr(ev_type), xfer_type, epnum, devnum, busnum,
+                sec + usec / 1e6, status, length,
+                setup if flag_setup == b'\0' else None,
+                bytes(buffer[offset + header_size:end]),
+            ))
+            offset = end
+        
+        del buffer[:offset]
+        return events
+    
+    @property
+    def pending(self) -> int:
+        """Bytes en attente d'un événement complet."""
+        return len(self._buffer)
+
+
+def iter_events(source, chunk_size: int = 65536):
+    """Lit un flux usbmon (périphérique ou dump) et génère ses événements."""
+    parser = UsbmonParser()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+
+
+def find_device(vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID):
+    """
+    Trouve le bus et l'adresse USB de la manette via sysfs.
+    
+    Returns:
+        (busnum, devnum) ou None si la manette n'est pas branchée.
+    """
+    try:
+        entries = os.listdir(USB_DEVICES)
+    except OSError:
+        return None
+    
+    def read_attr(entry, name):
+        with open(os.path.join(USB_DEVICES, entry, name)) as f:
+            return f.read().strip()
+    
+    for entry in entries:
+        try:
+            if (int(read_attr(entry, 'idVendor'), 16) == vendor_id
+                    and int(read_attr(entry, 'idProduct'), 16) == product_id):
+                return int(read_attr(entry, 'busnum')), int(read_attr(entry, 'devnum'))
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+class WireMonitor:
+    """
+    Statistiques des paquets de vibration vus sur le fil.
+    
+    Seules les soumissions host -> device (événements 'S' OUT, interrupt ou
+    control) du bus/périphérique filtré sont prises en compte.
+    """
+    
+    def __init__(self, busnum: int = None, devnum: int = None, window: float = 1.0):
+        """
+        Args:
+            busnum: Bus USB à garder (None: tous)
+            devnum: Adresse du périphérique à garder (None: tous)
+            window: Fenêtre du débit glissant en secondes
+        """
+        self.busnum = busnum
+        self.devnum = devnum
+        self.window = window
+        self.packets = 0
+        self.gaps = 0      # Discontinuités de séquence
+        self.lost = 0      # Paquets manquants estimés d'après les séquences
+        self.latencies = deque(maxlen=1000)  # Secondes, write() -> fil
+        self._times = deque()  # Horodatages dans la fenêtre glissante
+        self.last_latency = None  # Latence du dernier paquet (None si inconnue)
+        self._last_seq = None
+        self._written = {}  # Séquence -> heure du write() côté driver
+    
+    def attach(self, controller):
+        """Mesure la latence des écritures de ce contrôleur (même processus)."""
+        controller.on_write = self.record_write
+    
+    def record_write(self, command: bytes, timestamp: float):
+        """Note l'heure d'écriture d'un paquet (hook on_write du contrôleur)."""
+        self._written[command[2]] = timestamp
+    
+    def process(self, event: UsbmonEvent):
+        """
+        Traite un événement usbmon.
+        
+        Returns:
+            Le protocol.VibrationPacket décodé, ou None si l'événement est ignoré.
+        """
+        if (event.type != 'S' or event.epnum & DIR_IN
+                or event.xfer_type not in (XFER_INTERRUPT, XFER_CONTROL)
+                or (self.busnum is not None and event.busnum != self.busnum)
+                or (self.devnum is not None and event.devnum != self.devnum)):
+            return None
+        
+        packet = protocol.try_decode(event.data)
+        if packet is None:
+            return None
+        
+        self.packets += 1
+        self._times.append(event.timestamp)
+        while self._times[0] < event.timestamp - self.window:
+            self._times.popleft()
+        
+        seq = packet.sequence
+        if self._last_seq is not None:
+            delta = (seq - self._last_seq) & 0xFF
+            if delta != 1:
+                self.gaps += 1
+                # Saut en arrière (delta >= 128) ou nul: doublon ou paquet
+                # réordonné, pas de paquets perdus. Retour à 0 loin du wrap
+                # (séquence précédente < 128): reconnexion du driver, qui
+                # repart de 0. Près du wrap (250 -> 0), c'est une vraie perte
+                reconnect = seq == 0 and self._last_seq < 128
+                if 0 < delta < 128 and not reconnect:
+                    self.lost += delta - 1
+        self._last_seq = seq
+        
+        written = self._written.pop(seq, None)
+        self.last_latency = None if written is None else event.timestamp - written
+        if self.last_latency is not None:
+            self.latencies.append(self.last_latency)
+        return packet
+    
+    @property
+    def rate(self) -> float:
+        """Débit glissant en paquets/s."""
+        return len(self._times) / self.window
+    
+    def summary(self) -> str:
+        line = (f"{self.rate:7.1f} pkt/s | total {self.packets} | "
+                f"trous {self.gaps} (perdus {self.lost})")
+        if self.latencies:
+            values = sorted(self.latencies)
+            line += (f" | latence méd {values[len(values) // 2] * 1000:.2f}ms "
+                     f"max {values[-1] * 1000:.2f}ms")
+        return line
+
+
+def format_packet(event: UsbmonEvent, packet, latency: float = None) -> str:
+    line = (f"{time.strftime('%H:%M:%S', time.localtime(event.timestamp))}"
+            f".{int(event.timestamp * 1e6) % 1000000:06d} "
+            f"seq={packet.sequence:3d} mask=0x{packet.mask:02X} "
+            f"LT={packet.left_trigger:3d} RT={packet.right_trigger:3d} "
+            f"L={packet.left:3d} R={packet.right:3d}")
+    if latency is not None:
+        line += f"  (+{latency * 1000:.2f}ms)"
+    return line
+
+
+def monitor(source, wire: WireMonitor, record=None, show_packets: bool = True,
+            interval: float = 1.0):
+    """Boucle de lecture: décode, affiche et résume périodiquement."""
+    parser = UsbmonParser()
+    next_summary = time.monotonic() + interval
+    
+    while True:
+        chunk = source.read(65536)
+        if not chunk:
+            break
+        if record is not None:
+            record.write(chunk)
+        
+        for event in parser.feed(chunk):
+            packet = wire.process(event)
+            if packet is not None and show_packets:
+                print(format_packet(event, packet, wire.last_latency))
+        
+        if time.monotonic() >= next_summary:
+            print(f"[*] {wire.summary()}")
+            next_summary = time.monotonic() + interval
+
+
+def _check(label: str, ok: bool) -> bool:
+    print(f"  {'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def _build_dump(bus: int, dev: int, sequences, start: float, step: float = 0.01,
+                urb_base: int = 0) -> bytes:
+    """
+    Fabrique un dump usbmon: pour chaque séquence, la soumission OUT du paquet
+    de vibration, sa complétion et du bruit (lecture IN, autre périphérique,
+    transfert control sans vibration).
+    """
+    dump = b''
+    for n, seq in enumerate(sequences):
+        t = start + n * step
+        urb = urb_base + n
+        packet = protocol.encode(seq, left=n, right=seq % 101)
+        dump += pack_event(UsbmonEvent(urb, 'S', XFER_INTERRUPT, 0x02, dev, bus,
+                                       t, -115, len(packet), None, packet))
+        dump += pack_event(UsbmonEvent(urb, 'C', XFER_INTERRUPT, 0x02, dev, bus,
+                                       t + 0.001, 0, len(packet), None, b''))
+        dump += pack_event(UsbmonEvent(urb, 'S', XFER_INTERRUPT, 0x81, dev, bus,
+                                       t, -115, 64, None, b''))
+        dump += pack_event(UsbmonEvent(urb, 'S', XFER_INTERRUPT, 0x02, dev + 1, bus,
+                                       t, -115, len(packet), None, packet))
+        dump += pack_event(UsbmonEvent(urb, 'S', XFER_CONTROL, 0x00, dev, bus, t,
+                                       -115, 2, bytes([0x21, 0x09, 0, 2, 0, 0, 2, 0]),
+                                       b'\x02\x00'))
+    return dump
+
+
+def check() -> int:
+    """Vérifie parser, filtre et statistiques sur des dumps fabriqués avec pack_event()."""
+    from vibration import TurtleBeachController
+    from mock import MockDevice
+    
+    print("=" * 60)
+    print("Vérification du moniteur usbmon (dump synthétique)")
+    print("=" * 60)
+    results = []
+    start = time.time()
+    
+    # Séquences avec un trou (2 -> 7: 4 perdus) puis un paquet réordonné (7 -> 4)
+    sequences = [0, 1, 2, 7, 4, 5]
+    dump = _build_dump(3, 7, sequences, start)
+    
+    parser = UsbmonParser()
+    events = []
+    sizes = (1, 7, 13, 47, 48, 49, 101)
+    offset = i = 0
+    while offset < len(dump):
+        size = sizes[i % len(sizes)]
+        events += parser.feed(dump[offset:offset + size])
+        offset += size
+        i += 1
+    results.append(_check("morceaux de taille quelconque: tous les événements décodés",
+                          len(events) == 5 * len(sequences) and parser.pending == 0))
+    results.append(_check("aller-retour pack_event/parser",
+                          events[0].data == protocol.encode(0, 0, 0)
+                          and events[0].busnum == 3 and events[0].devnum == 7
+                          and abs(events[0].timestamp - start) < 1e-5))
+    
+    replayed = list(iter_events(io.BytesIO(dump), chunk_size=61))
+    results.append(_check("relecture d'un dump (iter_events)", replayed == events))
+    
+    wire = WireMonitor(3, 7)
+    packets = [p for p in map(wire.process, events) if p is not None]
+    results.append(_check("filtre bus/périphérique: seules les vibrations OUT gardées",
+                          [p.sequence for p in packets] == sequences))
+    results.append(_check("trous de séquence: 2 (dont 1 réordonné), 4 perdus",
+                          wire.gaps == 2 and wire.lost == 4))
+    results.append(_check("débit glissant", wire.rate == len(sequences) / wire.window))
+    
+    # Reconnexion du driver: la séquence repart de 0 loin du wrap
+    wire = WireMonitor(3, 7)
+    for event in iter_events(io.BytesIO(_build_dump(3, 7, [60, 61, 0, 1], start))):
+        wire.process(event)
+    results.append(_check("reconnexion: 1 trou, aucun paquet perdu",
+                          wire.gaps == 1 and wire.lost == 0))
+    
+    # Doublon (delta nul): un trou, aucun paquet perdu
+    wire = WireMonitor(3, 7)
+    for event in iter_events(io.BytesIO(_build_dump(3, 7, [1, 1, 2], start))):
+        wire.process(event)
+    results.append(_check("doublon: 1 trou, aucun paquet perdu",
+                          wire.gaps == 1 and wire.lost == 0))
+    
+    # Perte à travers le wrap (250 -> 0): 251 à 255 perdus
+    wire = WireMonitor(3, 7)
+    for event in iter_events(io.BytesIO(_build_dump(3, 7, [249, 250, 0, 1], start))):
+        wire.process(event)
+    results.append(_check("perte à travers le wrap: 5 perdus",
+                          wire.gaps == 1 and wire.lost == 5))
+    
+    # Latence write() -> fil avec le hook on_write du contrôleur
+    controller = TurtleBeachController(verbose=False)
+    controller.device = MockDevice()
+    wire = WireMonitor(3, 7)
+    wire.attach(controller)
+    controller.vibrate(left=10)
+    written = wire._written[0]
+    dump = _build_dump(3, 7, [0], written + 0.002)
+    for event in iter_events(io.BytesIO(dump)):
+        wire.process(event)
+    results.append(_check("latence write() -> fil mesurée",
+                          len(wire.latencies) == 1
+                          and abs(wire.latencies[0] - 0.002) < 1e-4))
+    
+    print(f"\n{sum(results)}/{len(results)} vérifications OK")
+    return 0 if all(results) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Moniteur usbmon - manette Turtle Beach')
+    parser.add_argument('--bus', type=int, help='Bus USB (défaut: détecté via sysfs)')
+    parser.add_argument('--dev', type=int, help='Adresse USB (défaut: détectée via sysfs)')
+    parser.add_argument('--replay', metavar='DUMP', help='Rejouer un dump usbmon binaire')
+    parser.add_argument('--record', metavar='DUMP', help='Enregistrer le flux brut')
+    parser.add_argument('--stream', metavar='FICHIER',
+                        help='Jouer une séquence (voir stream.py) et mesurer la latence')
+    parser.add_argument('--stats-only', action='store_true',
+                        help='Ne pas afficher chaque paquet')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Période du résumé en secondes')
+    parser.add_argument('--check', action='store_true',
+                        help='Vérifier parser et statistiques sur un dump synthétique')
+    args = parser.parse_args()
+    
+    if args.check:
+        return check()
+    
+    bus, dev = args.bus, args.dev
+    if args.replay:
+        path = args.replay
+    else:
+        if bus is None:
+            found = find_device()
+            if found is None:
+                print(f"[!] Manette non trouvée (VID:0x{VENDOR_ID:04X} PID:0x{PRODUCT_ID:04X})")
+                print("    Indiquez --bus/--dev ou utilisez --replay")
+                return 1
+            bus, dev = found
+            print(f"[*] Manette sur bus {bus}, adresse {dev}")
+        path = f"/dev/usbmon{bus}"
+    
+    try:
+        # buffering=0: chaque read() rend ce que le noyau a, sans attendre 64K
+        source = open(path, 'rb', buffering=0 if not args.replay else -1)
+    except OSError as e:
+        print(f"[!] Impossible d'ouvrir {path}: {e}")
+        if not args.replay:
+            print("    sudo modprobe usbmon, puis relancez en root")
+        return 1
+    
+    record = None
+    if args.record:
+        try:
+            record = open(args.record, 'wb')
+        except OSError as e:
+            print(f"[!] Impossible d'ouvrir {args.record}: {e}")
+            source.close()
+            return 1
+    wire = WireMonitor(bus, dev)
+    
+    try:
+        if args.stream:
+            return _monitor_stream(args, source, wire, record)
+        monitor(source, wire, record, not args.stats_only, args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+        if record is not None:
+            record.close()
+        print(f"\n[✓] {wire.summary()}")
+    return 0
+
+
+def _monitor_stream(args, source, wire: WireMonitor, record) -> int:
+    """Joue une séquence via le driver pendant que le fil est surveillé."""
+    import stream
+    from vibration import TurtleBeachController
+    
+    def read_wire():
+        try:
+            monitor(source, wire, record, not args.stats_only, args.interval)
+        except (OSError, ValueError):
+            pass  # Source fermée à la fin de la séquence
+    
+    reader = threading.Thread(target=read_wire, daemon=True)
+    reader.start()
+    
+    controller = TurtleBeachController(verbose=False)
+    if not controller.connect():
+        return 1
+    wire.attach(controller)
+    
+    try:
+        with open(args.stream) as f:
+            stream.run_stream(controller, stream.iter_text_frames(f))
+    except (OSError, ValueError) as e:
+        print(f"[!] {e}")
+        return 1
+    finally:
+        controller.disconnect(stop=False)  # run_stream() a déjà arrêté la manette
+        time.sleep(0.2)  # Laisser les derniers paquets arriver sur le fil
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,8 @@ Où:
 
 Usage:
     python vibration.py --demo
+    python vibration.py --left 50 --right 50 --duration 2 --quiet
+    python vibration.py --stream sequence.txt   # voir stream.py
     
     # Ou en import:
     from vibration import TurtleBeachController
@@ -24,44 +26,89 @@ Usage:
     controller.disconnect()
 """
 
-import time
+from __future__ import annotations
+
+import os
 import sys
-import argparse
-from typing import Optional
+import time
+from _thread import allocate_lock  # threading coûte ~5ms à l'import
 
-try:
-    import hid
-except ImportError:
-    print("Erreur: hidapi non installé. Exécutez: pip install hidapi")
-    sys.exit(1)
+import protocol
+
+# Note: hidapi et argparse sont importés à la demande (voir _import_hid() et
+# _build_parser()) pour que le CLI démarre vite quand il est lancé en boucle.
 
 # IDs de la manette Turtle Beach
 VENDOR_ID = 0x10F5
 PRODUCT_ID = 0x7018
 
+# Cache du chemin HID (évite hid.enumerate() à chaque lancement)
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'turtlebeach'
+)
+USB_DEVICES = '/sys/bus/usb/devices'
+
+
+def _import_hid():
+    """Importe hidapi à la demande. Retourne None s'il n'est pas installé."""
+    try:
+        import hid
+    except ImportError:
+        print("Erreur: hidapi non installé. Exécutez: pip install hidapi")
+        return None
+    return hid
+
 
 class TurtleBeachController:
     """Contrôleur de vibration pour manette Turtle Beach Xbox."""
     
-    # Constantes du protocole (découvertes par reverse engineering)
-    REPORT_ID = 0x09
-    MOTOR_MASK = 0x0F  # Active tous les moteurs
-    PACKET_SUFFIX = bytes([0xFF, 0x00, 0xEB])
-    MAX_INTENSITY = 100  # Intensité max acceptée par la manette
+    # Constantes du protocole (découvertes par reverse engineering, voir protocol.py)
+    REPORT_ID = protocol.REPORT_ID
+    MOTOR_MASK = protocol.MASK_ALL  # Active tous les moteurs
+    # Bits du masque (byte 5): seuls les moteurs dont le bit est à 1 sont mis à jour
+    MASK_LEFT_TRIGGER = protocol.MASK_LEFT_TRIGGER
+    MASK_RIGHT_TRIGGER = protocol.MASK_RIGHT_TRIGGER
+    MASK_LEFT = protocol.MASK_LEFT
+    MASK_RIGHT = protocol.MASK_RIGHT
+    MASK_TRIGGERS = protocol.MASK_TRIGGERS  # 0x03
+    MASK_MOTORS = protocol.MASK_MOTORS      # 0x0C
+    # Ordre des canaux = ordre des bytes 6 à 9 du paquet
+    CHANNELS = (MASK_LEFT_TRIGGER, MASK_RIGHT_TRIGGER, MASK_LEFT, MASK_RIGHT)
+    PACKET_SUFFIX = protocol.SUFFIX
+    MAX_INTENSITY = protocol.MAX_INTENSITY  # Intensité max acceptée par la manette
     
-    def __init__(self, vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID):
+    def __init__(self, vendor_id: int = VENDOR_ID, product_id: int = PRODUCT_ID,
+                 verbose: bool = True, watchdog=None):
         self.vendor_id = vendor_id
         self.product_id = product_id
-        self.device: Optional[hid.device] = None
+        self.verbose = verbose  # False: n'affiche que les erreurs
+        self.device = None  # hid.device une fois connecté
         self.sequence = 0  # Compteur de séquence
+        self.watchdog = watchdog  # watchdog.Watchdog optionnel (arrêt sur TTL)
+        self._watchdog_timers = {}  # Bit moteur -> échéance armée
+        self._lock = allocate_lock()  # Sérialise séquence + écriture
+        self.on_write = None  # Hook optionnel: on_write(command, time.time())
+        self.rate_control = None  # ratecontrol.AdaptiveRate optionnel
         
-    def connect(self) -> bool:
+    def connect(self, use_cache: bool = True) -> bool:
         """
         Connecte à la manette.
         
+        Args:
+            use_cache: Essayer d'abord le chemin HID mis en cache lors de la
+                dernière connexion (saute l'énumération des interfaces).
+        
         Returns:
             True si connexion réussie, False sinon.
         """
+        hid = _import_hid()
+        if hid is None:
+            return False
+        
+        if use_cache and self._connect_cached(hid):
+            return True
+        
         try:
             devices = hid.enumerate(self.vendor_id, self.product_id)
             
@@ -74,8 +121,9 @@ class TurtleBeachController:
             # Chercher l'interface appropriée
             target_device = None
             for dev in devices:
-                print(f"[*] Interface {dev['interface_number']}: "
-                      f"usage_page=0x{dev.get('usage_page', 0):04X}")
+                if self.verbose:
+                    print(f"[*] Interface {dev['interface_number']}: "
+                          f"usage_page=0x{dev.get('usage_page', 0):04X}")
                 # Généralement interface 0 pour les commandes
                 if dev['interface_number'] == 0:
                     target_device = dev
@@ -83,12 +131,8 @@ class TurtleBeachController:
             if not target_device:
                 target_device = devices[0]
             
-            self.device = hid.device()
-            self.device.open_path(target_device['path'])
-            self.device.set_nonblocking(1)
-            
-            print(f"[✓] Connecté: {self.device.get_product_string()}")
-            self.sequence = 0
+            self._open_path(hid, target_device['path'])
+            self._save_cached_path(target_device['path'])
             return True
             
         except Exception as e:
@@ -96,20 +140,135 @@ class TurtleBeachController:
             self._print_permission_help()
             return False
     
-    def disconnect(self):
-        """Déconnecte proprement."""
+    def _open_path(self, hid, path: bytes):
+        """Ouvre le périphérique HID à partir de son chemin."""
+        self.device = hid.device()
+        self.device.open_path(path)
+        self.device.set_nonblocking(1)
+        
+        if self.verbose:
+            print(f"[✓] Connecté: {self.device.get_product_string()}")
+        self.sequence = 0
+    
+    @property
+    def cache_file(self) -> str:
+        """Fichier de cache du chemin HID pour ce VID/PID."""
+        return os.path.join(CACHE_DIR,
+                            f"device_{self.vendor_id:04x}_{self.product_id:04x}")
+    
+    def _connect_cached(self, hid) -> bool:
+        """
+        Ouvre directement le chemin HID mis en cache, sans énumération.
+        
+        Le cache est supprimé s'il n'est plus valide (manette débranchée,
+        nœud hidraw réattribué à un autre périphérique...).
+        """
+        try:
+            with open(self.cache_file, 'rb') as f:
+                path = f.read()
+        except OSError:
+            return False
+        
+        if path and self._cached_path_matches(path):
+            try:
+                self._open_path(hid, path)
+                return True
+            except Exception:
+                self.device = None
+        
+        try:
+            os.remove(self.cache_file)
+        except OSError:
+            pass
+        return False
+    
+    def _cached_path_matches(self, path: bytes) -> bool:
+        """
+        Vérifie via sysfs qu'un chemin HID en cache désigne toujours la manette.
+        
+        Les nœuds hidraw comme les adresses USB sont réattribués après un
+        débranchement: un chemin non vérifiable n'est jamais réutilisé.
+        """
+        path = path.decode(errors='replace')
+        if path.startswith('/dev/hidraw'):
+            node = os.path.basename(path)
+            try:
+                with open(f"/sys/class/hidraw/{node}/device/uevent") as f:
+                    uevent = f.read()
+            except OSError:
+                return False
+            
+            hid_id = f":{self.vendor_id:08X}:{self.product_id:08X}"
+            return any(line.startswith('HID_ID=') and line.upper().endswith(hid_id)
+                       for line in uevent.splitlines())
+        
+        # Backend libusb: "1-2.3:1.0" (port USB, hidapi >= 0.10)
+        # ou "0001:0005:00" (bus:adresse:interface en hexa, anciennes versions)
+        fields = path.split(':')
+        if len(fields) == 2 and '-' in fields[0]:
+            return self._usb_device_matches(fields[0])
+        if len(fields) == 3:
+            try:
+                bus, address = int(fields[0], 16), int(fields[1], 16)
+            except ValueError:
+                return False
+            return any(self._usb_device_matches(entry, bus, address)
+                       for entry in self._list_usb_devices())
+        return False
+    
+    @staticmethod
+    def _list_usb_devices() -> list:
+        try:
+            return os.listdir(USB_DEVICES)
+        except OSError:
+            return []
+    
+    def _usb_device_matches(self, entry: str, bus: int = None, address: int = None) -> bool:
+        """Compare VID/PID (et bus/adresse si donnés) d'un périphérique de /sys/bus/usb/devices."""
+        def read_attr(name):
+            with open(os.path.join(USB_DEVICES, entry, name)) as f:
+                return int(f.read().strip(), 16 if name.startswith('id') else 10)
+        
+        try:
+            if bus is not None and (read_attr('busnum') != bus or read_attr('devnum') != address):
+                return False
+            return (read_attr('idVendor') == self.vendor_id
+                    and read_attr('idProduct') == self.product_id)
+        except (OSError, ValueError):
+            return False
+    
+    def _save_cached_path(self, path: bytes):
+        """Mémorise le chemin HID pour les prochains lancements."""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self.cache_file, 'wb') as f:
+                f.write(path)
+        except OSError:
+            pass  # Le cache est optionnel
+    
+    def disconnect(self, stop: bool = True):
+        """
+        Déconnecte proprement.
+        
+        Args:
+            stop: Envoyer un paquet d'arrêt avant de fermer (False si la
+                manette vient déjà d'être arrêtée)
+        """
         if self.device:
-            self.stop_vibration()
+            if stop:
+                self.stop_vibration()
             self.device.close()
             self.device = None
-            print("[✓] Déconnecté")
+            if self.verbose:
+                print("[✓] Déconnecté")
     
     def _build_vibration_command(self, left: int, right: int, 
-                                  left_trigger: int = 0, right_trigger: int = 0) -> bytes:
+                                  left_trigger: int = 0, right_trigger: int = 0,
+                                  mask: int = MOTOR_MASK) -> bytes:
         """
         Construit la commande de vibration selon le protocole découvert.
         
-        Format: 09 00 [SEQ] 09 00 0F [LT] [RT] [L] [R] FF 00 EB
+        Format: 09 00 [SEQ] 09 00 [MASK] [LT] [RT] [L] [R] FF 00 EB
         """
         # Clamp les valeurs entre 0 et MAX_INTENSITY
         left = max(0, min(self.MAX_INTENSITY, left))
@@ -117,18 +276,8 @@ class TurtleBeachController:
         left_trigger = max(0, min(self.MAX_INTENSITY, left_trigger))
         right_trigger = max(0, min(self.MAX_INTENSITY, right_trigger))
         
-        command = bytes([
-            self.REPORT_ID,    # 0x09 - Report ID
-            0x00,              # Toujours 0x00
-            self.sequence,     # Numéro de séquence
-            0x09,              # Toujours 0x09
-            0x00,              # Toujours 0x00
-            self.MOTOR_MASK,   # 0x0F - Masque moteurs (tous activés)
-            left_trigger,      # Moteur gâchette gauche
-            right_trigger,     # Moteur gâchette droite
-            left,              # Moteur gauche (gros, basses fréquences)
-            right,             # Moteur droit (petit, hautes fréquences)
-        ]) + self.PACKET_SUFFIX  # FF 00 EB
+        command = protocol.encode(self.sequence, left, right,
+                                  left_trigger, right_trigger, mask)
         
         # Incrémenter la séquence (wrap à 256)
         self.sequence = (self.sequence + 1) & 0xFF
@@ -136,7 +285,8 @@ class TurtleBeachController:
         return command
     
     def vibrate(self, left: int = 0, right: int = 0,
-                left_trigger: int = 0, right_trigger: int = 0) -> bool:
+                left_trigger: int = 0, right_trigger: int = 0,
+                ttl: float = None) -> bool:
         """
         Active la vibration.
         
@@ -145,26 +295,147 @@ class TurtleBeachController:
             right: Intensité moteur droit (0-100)
             left_trigger: Intensité gâchette gauche (0-100)
             right_trigger: Intensité gâchette droite (0-100)
+            ttl: Durée de validité (s) de cet état si un watchdog est attaché:
+                sans nouvelle commande d'ici là, la manette est arrêtée.
+                None: TTL par défaut du watchdog, 0: pas d'expiration.
             
         Returns:
-            True si commande envoyée avec succès.
+            True si commande envoyée avec succès. False aussi si le watchdog
+            est fermé et que l'état devrait expirer: la commande n'est alors
+            pas envoyée (un arrêt l'est toujours).
+        """
+        return self._send(self.MOTOR_MASK, left, right, left_trigger, right_trigger, ttl)
+    
+    def vibrate_motors(self, left: int = 0, right: int = 0, ttl: float = None) -> bool:
+        """
+        Met à jour uniquement les moteurs principaux (masque 0x0C).
+        
+        Les gâchettes gardent leur état: un autre producteur peut les piloter
+        via vibrate_triggers() sans coordination avec celui-ci.
+        
+        Args:
+            left: Intensité moteur gauche (0-100)
+            right: Intensité moteur droit (0-100)
+            ttl: Voir vibrate()
+        """
+        return self._send(self.MASK_MOTORS, left, right, 0, 0, ttl)
+    
+    def vibrate_triggers(self, left_trigger: int = 0, right_trigger: int = 0,
+                         ttl: float = None) -> bool:
         """
+        Met à jour uniquement les moteurs des gâchettes (masque 0x03).
+        
+        Args:
+            left_trigger: Intensité gâchette gauche (0-100)
+            right_trigger: Intensité gâchette droite (0-100)
+            ttl: Voir vibrate()
+        """
+        return self._send(self.MASK_TRIGGERS, 0, 0, left_trigger, right_trigger, ttl)
+    
+    def _send(self, mask: int, left: int, right: int,
+              left_trigger: int, right_trigger: int, ttl: float = None) -> bool:
+        """Envoie une commande pour les moteurs du masque et réarme le watchdog."""
         if not self.device:
             print("[!] Non connecté")
             return False
         
-        command = self._build_vibration_command(left, right, left_trigger, right_trigger)
+        with self._lock:
+            active = 0
+            if self.watchdog is not None:
+                levels = (left_trigger, right_trigger, left, right)
+                for bit, level in zip(self.CHANNELS, levels):
+                    if mask & bit and level > 0:
+                        active |= bit
+                if ttl is None:
+                    ttl = self.watchdog.default_ttl
+                if active and ttl and self.watchdog.closed:
+                    # Un état qui ne pourrait plus expirer n'est pas envoyé
+                    # (les arrêts passent toujours)
+                    print("[!] Watchdog fermé: commande de vibration ignorée")
+                    return False
+            
+            command = self._build_vibration_command(left, right, left_trigger,
+                                                    right_trigger, mask)
+            if not self._write(command):
+                return False  # État inchangé: les échéances en cours restent
+            if self.watchdog is not None:
+                return self._rearm_watchdog(mask, active, ttl)
+            return True
+    
+    def _rearm_watchdog(self, mask: int, active: int, ttl: float) -> bool:
+        """
+        Remplace les échéances des moteurs du masque (appelé avec self._lock,
+        après l'envoi de la commande).
+        
+        Les moteurs `active` partagent une seule échéance; une échéance n'est
+        annulée dans le watchdog que lorsque plus aucun moteur n'y fait
+        référence.
+        
+        Returns:
+            False si le watchdog a été fermé entre-temps (état non surveillé).
+        """
+        for bit in self.CHANNELS:
+            if not mask & bit:
+                continue
+            timer = self._watchdog_timers.pop(bit, None)
+            if timer is not None and timer not in self._watchdog_timers.values():
+                self.watchdog.cancel(timer)
+        
+        if active and ttl:
+            try:
+                timer = self.watchdog.arm(self, ttl)
+            except RuntimeError:
+                print("[!] Watchdog fermé: l'état envoyé n'expirera pas")
+                return False
+            for bit in self.CHANNELS:
+                if active & bit:
+                    self._watchdog_timers[bit] = timer
+        return True
+    
+    def _watchdog_expired(self, timer) -> bool:
+        """
+        Appelé par le watchdog à l'expiration de `timer`.
         
+        Envoie un unique paquet d'arrêt, masqué sur les moteurs que cette
+        échéance couvre encore (ceux réarmés entre-temps ne sont pas touchés).
+        
+        Returns:
+            True si le paquet d'arrêt a été envoyé.
+        """
+        with self._lock:
+            mask = 0
+            for bit, armed in list(self._watchdog_timers.items()):
+                if armed is timer:
+                    mask |= bit
+                    del self._watchdog_timers[bit]
+            if not mask or not self.device:
+                return False
+            return self._write(self._build_vibration_command(0, 0, 0, 0, mask))
+    
+    def _write(self, command: bytes) -> bool:
+        """Écrit une commande sur le périphérique (appelé avec self._lock)."""
+        written_at = time.time()
+        start = time.perf_counter()
         try:
             # Note: Sur certains systèmes, il faut ajouter 0x00 au début
             result = self.device.write(command)
             if result < 0:
                 # Essayer avec un byte supplémentaire au début
                 result = self.device.write(bytes([0x00]) + command)
-            return result >= 0
         except Exception as e:
             print(f"[!] Erreur d'envoi: {e}")
-            return False
+            result = -1
+        
+        if self.rate_control is not None:
+            self.rate_control.record(time.perf_counter() - start, result >= 0)
+        if result >= 0 and self.on_write is not None:
+            self.on_write(command, written_at)
+        return result >= 0
+    
+    @property
+    def current_rate(self):
+        """Débit d'envoi courant (paquets/s) si le contrôle adaptatif est actif."""
+        return self.rate_control.rate if self.rate_control is not None else None
     
     def stop_vibration(self) -> bool:
         """Arrête toute vibration."""
@@ -197,6 +468,9 @@ class TurtleBeachController:
     
     def _list_available_devices(self):
         """Liste les périphériques HID disponibles."""
+        hid = _import_hid()
+        if hid is None:
+            return
         print("\n[*] Périphériques HID disponibles:")
         for d in hid.enumerate():
             if d['vendor_id'] in [0x10F5, 0x045E]:
@@ -256,29 +530,190 @@ def demo():
         controller.disconnect()
 
 
-def main():
+# Options reconnues par l'analyse rapide des arguments: nom -> (attribut, type)
+_FAST_OPTIONS = {
+    '--left': ('left', int), '-l': ('left', int),
+    '--right': ('right', int), '-r': ('right', int),
+    '--duration': ('duration', float), '-d': ('duration', float),
+    '--pulse': ('pulse', int), '-p': ('pulse', int),
+}
+_FAST_FLAGS = {'--quiet': 'quiet', '-q': 'quiet', '--no-cache': 'no_cache'}
+
+# Valeurs par défaut des options, partagées par argparse et l'analyse rapide
+_DEFAULTS = {
+    'demo': False, 'left': 0, 'right': 0, 'duration': 1.0, 'pulse': 0,
+    'quiet': False, 'no_cache': False, 'stream': None, 'binary': False,
+    'rate': 100, 'adaptive': False, 'min_rate': 10, 'initial_rate': None,
+    'mock': False,
+}
+
+
+def _build_parser():
+    """Construit le parser argparse (importé seulement si nécessaire)."""
+    import argparse
+    
     parser = argparse.ArgumentParser(description='Turtle Beach Controller Vibration')
     parser.add_argument('--demo', action='store_true', help='Lancer la démo')
-    parser.add_argument('--left', '-l', type=int, default=0, help='Intensité moteur gauche (0-100)')
-    parser.add_argument('--right', '-r', type=int, default=0, help='Intensité moteur droit (0-100)')
-    parser.add_argument('--duration', '-d', type=float, default=1.0, help='Durée en secondes')
-    parser.add_argument('--pulse', '-p', type=int, default=0, help='Nombre de pulses')
+    parser.add_argument('--left', '-l', type=int, help='Intensité moteur gauche (0-100)')
+    parser.add_argument('--right', '-r', type=int, help='Intensité moteur droit (0-100)')
+    parser.add_argument('--duration', '-d', type=float, help='Durée en secondes')
+    parser.add_argument('--pulse', '-p', type=int, help='Nombre de pulses')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help="N'afficher que les erreurs")
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignorer le chemin HID en cache (force l\'énumération)')
+    parser.add_argument('--stream', '-s', nargs='?', const='-', metavar='FICHIER',
+                        help='Jouer une séquence depuis un fichier ou stdin (-)')
+    parser.add_argument('--binary', action='store_true',
+                        help='Flux au format binaire compact (avec --stream)')
+    parser.add_argument('--rate', type=float,
+                        help='Paquets/s max en mode flux (défaut: %(default)s)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adapter le débit à la manette entre --min-rate et --rate')
+    parser.add_argument('--min-rate', type=float,
+                        help='Paquets/s min avec --adaptive (défaut: %(default)s)')
+    parser.add_argument('--initial-rate', type=float,
+                        help='Paquets/s de départ avec --adaptive (défaut: --rate)')
+    parser.add_argument('--mock', action='store_true',
+                        help='Faux périphérique, sans manette (test de séquences)')
+    parser.set_defaults(**_DEFAULTS)
+    return parser
+
+
+def _parse_fast(argv):
+    """
+    Analyse rapide des invocations simples (--left/--right/--duration/--pulse).
+    
+    Évite d'importer et de construire argparse pour les appels scriptés.
+    Retourne None dès que l'invocation sort de ce cadre (aide, --demo,
+    abréviations, valeur invalide...): argparse prend alors le relais.
+    """
+    from types import SimpleNamespace
+    
+    values = dict(_DEFAULTS)
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in _FAST_FLAGS:
+            values[_FAST_FLAGS[arg]] = True
+            i += 1
+            continue
+        
+        name, sep, value = arg.partition('=') if arg.startswith('--') else (arg, '', '')
+        if name not in _FAST_OPTIONS:
+            return None
+        if not sep:
+            i += 1
+            if i >= len(argv):
+                return None
+            value = argv[i]
+        
+        dest, convert = _FAST_OPTIONS[name]
+        try:
+            values[dest] = convert(value)
+        except ValueError:
+            return None
+        i += 1
+    
+    return SimpleNamespace(**values)
+
+
+def parse_args(argv=None):
+    """Analyse les arguments: chemin rapide, sinon argparse."""
+    if argv is None:
+        argv = sys.argv[1:]
+    return _parse_fast(argv) or _build_parser().parse_args(argv)
+
+
+def _open_controller(args):
+    """Crée et connecte le contrôleur selon les options. None si échec."""
+    controller = TurtleBeachController(verbose=not args.quiet)
+    if args.mock:
+        from mock import MockDevice
+        controller.device = MockDevice()
+        return controller
+    if not controller.connect(use_cache=not args.no_cache):
+        return None
+    return controller
+
+
+def adaptive_rate(args):
+    """Crée le contrôle de débit adaptatif à partir des options du CLI."""
+    from ratecontrol import AdaptiveRate
+    
+    return AdaptiveRate(min_rate=args.min_rate, max_rate=args.rate,
+                        initial_rate=args.initial_rate)
+
+
+def stream_main(args):
+    """Mode flux: joue une séquence lue sur stdin ou dans un fichier."""
+    import stream
+    
+    if args.rate <= 0 or (args.adaptive and not 0 < args.min_rate <= args.rate):
+        print("[!] Il faut 0 < --min-rate <= --rate")
+        return 1
+    
+    try:
+        if args.stream == '-':
+            source = sys.stdin.buffer if args.binary else sys.stdin
+        else:
+            source = open(args.stream, 'rb' if args.binary else 'r')
+    except OSError as e:
+        print(f"[!] Impossible d'ouvrir {args.stream}: {e}")
+        return 1
+    
+    controller = _open_controller(args)
+    if controller is None:
+        if source is not sys.stdin and source is not sys.stdin.buffer:
+            source.close()
+        return 1
+    if args.adaptive:
+        controller.rate_control = adaptive_rate(args)
+    
+    frames = (stream.iter_binary_frames(source) if args.binary
+              else stream.iter_text_frames(source))
+    try:
+        stats = stream.run_stream(controller, frames, rate=args.rate)
+    except ValueError as e:
+        print(f"[!] Flux invalide: {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n[!] Interrompu")
+        return 1
+    finally:
+        controller.disconnect(stop=False)  # run_stream() a déjà arrêté la manette
+        if source is not sys.stdin and source is not sys.stdin.buffer:
+            source.close()
     
-    args = parser.parse_args()
+    if not args.quiet:
+        print(f"[✓] {stats['frames']} états en {stats['elapsed']:.2f}s: "
+              f"{stats['sent']} envoyés, {stats['failed']} échecs, "
+              f"{stats['coalesced']} fusionnés, "
+              f"{stats['underruns']} underruns, retard max {stats['max_late_ms']:.1f}ms, "
+              f"débit {stats['rate']:.0f} paquets/s")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
     
     if args.demo:
         return demo()
     
+    if args.stream is not None:
+        return stream_main(args)
+    
     if args.left == 0 and args.right == 0 and args.pulse == 0:
-        parser.print_help()
+        _build_parser().print_help()
         print("\nExemples:")
         print("  python vibration.py --demo")
         print("  python vibration.py --left 50 --right 50 --duration 2")
         print("  python vibration.py --pulse 3 --left 80")
+        print("  ./generateur | python vibration.py --stream - --rate 125")
         return 0
     
-    controller = TurtleBeachController()
-    if not controller.connect():
+    controller = _open_controller(args)
+    if controller is None:
         return 1
     
     try:
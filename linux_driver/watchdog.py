@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Watchdog de sécurité: arrête les manettes dont l'état moteur a expiré.
+
+Chaque commande de vibration envoyée avec un TTL arme une échéance. Si aucune
+nouvelle commande n'arrive avant l'échéance (producteur planté, bloqué...),
+la manette reçoit un unique paquet d'arrêt.
+
+Toutes les échéances, quel que soit le nombre de manettes, sont gérées par une
+roue de temporisation hachée (hashed timer wheel) et un seul thread: armer ou
+annuler une échéance est en O(1), même avec des milliers d'échéances en attente.
+
+Usage:
+    from vibration import TurtleBeachController
+    from watchdog import Watchdog
+
+    watchdog = Watchdog(default_ttl=0.5)
+    controller = TurtleBeachController(watchdog=watchdog)
+    controller.connect()
+    controller.vibrate(left=80)           # s'arrête seul après 0.5s
+    controller.vibrate(left=80, ttl=2.0)  # TTL explicite
+    ...
+    watchdog.close()
+"""
+
+import math
+import threading
+import time
+
+
+class TimerHandle:
+    """Échéance armée dans une TimerWheel (à passer à cancel())."""
+    
+    __slots__ = ('expire_tick', 'callback', 'slot')
+    
+    def __init__(self, expire_tick: int, callback, slot: dict):
+        self.expire_tick = expire_tick
+        self.callback = callback
+        self.slot = slot
+
+
+class TimerWheel:
+    """
+    Roue de temporisation hachée servie par un thread unique.
+    
+    Le temps est découpé en ticks de `tick` secondes. Une échéance est rangée
+    dans l'emplacement (tick d'expiration % slots); chaque emplacement est un
+    dict utilisé comme ensemble, d'où l'insertion et la suppression en O(1).
+    À chaque tick, seul l'emplacement courant est parcouru: les échéances qui
+    tombent dans un tour ultérieur de la roue y restent.
+    """
+    
+    def __init__(self, tick: float = 0.01, slots: int = 512):
+        self.tick = tick
+        self._slots = [{} for _ in range(slots)]
+        self._lock = threading.Lock()
+        self._current = 0  # Index absolu du dernier tick traité
+        self._pending = 0
+        self._origin = time.monotonic()
+        self._thread = None
+        self._stopping = threading.Event()
+    
+    def __len__(self) -> int:
+        """Nombre d'échéances en attente."""
+        return self._pending
+    
+    @property
+    def closed(self) -> bool:
+        """True après close()."""
+        return self._stopping.is_set()
+    
+    def schedule(self, delay: float, callback) -> TimerHandle:
+        """
+        Arme une échéance.
+        
+        Args:
+            delay: Délai en secondes (arrondi au tick supérieur, 1 tick minimum)
+            callback: Appelée avec le handle depuis le thread de la roue
+        
+        Returns:
+            Handle à passer à cancel().
+        
+        Raises:
+            RuntimeError: La roue a été fermée (close()).
+        """
+        ticks = max(1, math.ceil(delay / self.tick))
+        with self._lock:
+            if self._stopping.is_set():
+                raise RuntimeError("roue de temporisation fermée")
+            if self._thread is None:
+                self._start()
+            # Depuis l'horloge et non self._current: le thread peut être en
+            # retard (callback bloqué dans write()), l'échéance ne doit pas
+            # pour autant être avancée
+            now_tick = int((time.monotonic() - self._origin) / self.tick)
+            expire_tick = max(now_tick, self._current) + ticks
+            slot = self._slots[expire_tick % len(self._slots)]
+            handle = TimerHandle(expire_tick, callback, slot)
+            slot[handle] = None
+            self._pending += 1
+        return handle
+    
+    def cancel(self, handle: TimerHandle) -> bool:
+        """Annule une échéance. Retourne False si elle a déjà expiré."""
+        with self._lock:
+            if handle not in handle.slot:
+                return False
+            del handle.slot[handle]
+            self._pending -= 1
+        return True
+    
+    def close(self):
+        """
+        Arrête le thread de la roue.
+        
+        Les échéances en attente sont abandonnées et schedule() lève ensuite
+        RuntimeError, pour qu'aucune échéance ne soit armée sans jamais expirer.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _start(self):
+        """Démarre le thread (appelé avec self._lock, aucune échéance armée)."""
+        # La roue démarre maintenant: pas de ticks à rattraper depuis __init__
+        self._origin = time.monotonic()
+        self._current = 0
+        self._thread = threading.Thread(target=self._run, name='timer-wheel',
+                                        daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            # Échéance absolue du prochain tick: pas de dérive cumulée
+            target = self._origin + (self._current + 1) * self.tick
+            delay = target - time.monotonic()
+            if delay > 0 and self._stopping.wait(delay):
+                break
+            
+            # Rattrape les ticks manqués si le thread a pris du retard
+            now_tick = int((time.monotonic() - self._origin) / self.tick)
+            while self._current < now_tick:
+                self._advance()
+    
+    def _advance(self):
+        """Traite un tick: déclenche les échéances arrivées à terme."""
+        with self._lock:
+            self._current += 1
+            slot = self._slots[self._current % len(self._slots)]
+            expired = [h for h in slot if h.expire_tick <= self._current]
+            for handle in expired:
+                del slot[handle]
+            self._pending -= len(expired)
+        
+        for handle in expired:
+            try:
+                handle.callback(handle)
+            except Exception as e:
+                print(f"[!] Erreur watchdog: {e}")
+
+
+class Watchdog:
+    """
+    Arrête automatiquement les manettes dont l'état moteur a expiré.
+    
+    Un même Watchdog peut surveiller un nombre quelconque de manettes:
+    toutes partagent la même roue et le même thread.
+    """
+    
+    def __init__(self, default_ttl: float = None, tick: float = 0.01,
+                 slots: int = 512):
+        """
+        Args:
+            default_ttl: TTL (s) appliqué aux commandes envoyées sans TTL
+                explicite. None: pas d'expiration par défaut.
+            tick: Résolution des échéances en secondes
+            slots: Nombre d'emplacements de la roue
+        """
+        self.default_ttl = default_ttl
+        self.wheel = TimerWheel(tick=tick, slots=slots)
+        self.expired = 0  # Nombre de paquets d'arrêt envoyés par le watchdog
+    
+    def arm(self, controller, ttl: float) -> TimerHandle:
+        """Arme l'échéance d'une manette (appelé par le contrôleur)."""
+        return self.wheel.schedule(ttl, lambda handle: self._expire(controller, handle))
+    
+    def _expire(self, controller, handle: TimerHandle):
+        if controller._watchdog_expired(handle):
+            self.expired += 1
+    
+    def cancel(self, handle: TimerHandle) -> bool:
+        """Annule une échéance (appelé par le contrôleur)."""
+        return self.wheel.cancel(handle)
+    
+    @property
+    def closed(self) -> bool:
+        """True après close(): les contrôleurs refusent alors les états à TTL."""
+        return self.wheel.closed
+    
+    def close(self):
+        """
+        Arrête le thread du watchdog.
+        
+        Les échéances en attente sont abandonnées. Ensuite, vibrate() refuse
+        (retourne False) les commandes qui devraient expirer; les arrêts et
+        les commandes à ttl=0 passent toujours.
+        """
+        self.wheel.close()